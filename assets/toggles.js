@@ -0,0 +1,41 @@
+// Clientside callbacks for pure UI state; registered from aurora.py via ClientsideFunction
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    toggles: {
+        update_toggles: function(selectedCoin, intervalValue, indicatorsSelected, timeframeClicks, currentToggles) {
+            const toggles = Object.assign({}, currentToggles);
+            const triggered = dash_clientside.callback_context.triggered;
+            if (!triggered.length) {
+                return toggles;
+            }
+            const propId = triggered[0].prop_id;
+            const changedId = propId.slice(0, propId.lastIndexOf('.'));
+
+            if (changedId === 'crypto-selector' && selectedCoin) {
+                toggles.coin = selectedCoin;
+            } else if (changedId === 'interval-dropdown' && intervalValue) {
+                toggles.interval = intervalValue;
+            } else if (changedId === 'indicators-dropdown') {
+                const selected = indicatorsSelected || [];
+                // Candle wins if both chart types are picked; default to candle if neither is
+                toggles.chart_type = selected.includes('line') && !selected.includes('candle') ? 'line' : 'candle';
+                toggles.sma_on = selected.includes('sma');
+                toggles.rsi_on = selected.includes('rsi');
+                toggles.volume_on = selected.includes('volume');
+                toggles.macd_on = selected.includes('macd');
+                toggles.stochastic_on = selected.includes('stochastic');
+                toggles.ema_on = selected.includes('ema');
+            } else if (changedId.startsWith('{')) {
+                // Pattern-matching timeframe button: {"index": <timeframe>, "type": "timeframe-button"}
+                toggles.timeframe = JSON.parse(changedId).index;
+            }
+            return toggles;
+        },
+
+        timeframe_button_styles: function(toggles, buttonIds) {
+            const timeframe = toggles.timeframe || '1month';
+            return buttonIds.map(
+                id => id.index === timeframe ? 'timeframe-button selected' : 'timeframe-button'
+            );
+        }
+    }
+});
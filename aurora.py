@@ -1,11 +1,25 @@
+import json
+import math
+import os
 import requests
 import time
-from datetime import datetime, timedelta
+from datetime import timedelta
+from functools import lru_cache
 import dash
-from dash import html, dcc
-from dash.dependencies import Input, Output, State
+import flask
+from dash import html, dcc, Patch, no_update
+from dash.dependencies import ALL, ClientsideFunction, Input, Output, State
+from dash.exceptions import PreventUpdate
 import plotly.graph_objs as go
 import numpy as np
+from flask_caching import Cache
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    # orjson is optional; stdlib json also accepts the raw response bytes
+    _json_loads = json.loads
 
 from coin_config import COIN_CONFIG
 
@@ -13,91 +27,174 @@ from indicators import calc_sma, calc_ema, calc_stochastic, calc_macd, calc_rsi
 
 PRICE_CACHE_TTL = 1
 HISTORICAL_DATA_CACHE_TTL = 300
-COINGECKO_CACHE_TTL = 60
-
-price_cache = {}
-historical_data_cache = {}
-coingecko_extra_cache = {}
 
-app = dash.Dash(__name__)
-server = app.server
+# Relative CoinGecko/CryptoCompare price gap (20 bps) above which Kraken is also asked
+KRAKEN_TIEBREAK_SPREAD = 0.002
+
+# Record layout for parsing CryptoCompare bars in a single pass
+BAR_DTYPE = np.dtype([("t", np.int64), ("o", np.float32), ("h", np.float32),
+                      ("l", np.float32), ("c", np.float32), ("v", np.float32)])
+
+# Upper bound on bars sent to the browser per series. It sits well above a 1-month hourly
+# window (~720 bars), so only longer histories have runs of bars merged into one.
+MAX_CHART_POINTS = 1500
+
+# Lookback window for each timeframe button ("ALL" keeps every bar)
+TIMEFRAME_WINDOWS = {
+    "1hour": timedelta(hours=1),
+    "1day": timedelta(days=1),
+    "1week": timedelta(days=7),
+    "1month": timedelta(days=30),
+    "3month": timedelta(days=90),
+    "6month": timedelta(days=180),
+    "1year": timedelta(days=365),
+}
+
+# Flask-Compress reads its config when Dash enables it, so set mimetypes/level on the server first
+server = flask.Flask(__name__)
+server.config.update(
+    COMPRESS_MIMETYPES=["application/json", "text/html", "text/javascript", "application/javascript", "text/css"],
+    COMPRESS_LEVEL=6,
+)
+app = dash.Dash(__name__, server=server, compress=True)
 app.title = "Aurora"
 
+# API response cache. The default on-disk FileSystemCache is shared by every Gunicorn
+# worker; a single-process deployment can set AURORA_CACHE_TYPE=SimpleCache to keep hits
+# in memory, and multi-host ones AURORA_CACHE_TYPE=RedisCache with AURORA_CACHE_REDIS_URL.
+cache = Cache(server, config={
+    "CACHE_TYPE": os.environ.get("AURORA_CACHE_TYPE", "FileSystemCache"),
+    "CACHE_DIR": os.environ.get("AURORA_CACHE_DIR", "./aurora_cache"),
+    "CACHE_REDIS_URL": os.environ.get("AURORA_CACHE_REDIS_URL"),
+    "CACHE_DEFAULT_TIMEOUT": HISTORICAL_DATA_CACHE_TTL,
+    # Entry cap for the Simple/FileSystem backends, which prune expired entries first
+    # once it is hit. Each memoized result takes one entry, plus one version entry per
+    # memoized function.
+    "CACHE_THRESHOLD": 1024,
+})
+
 AURORA_LOGO_URL = app.get_asset_url('aurora_logo.png')
 
 from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared worker pool and keep-alive session reused across price and history fetches.
+# A price refresh takes one worker for the CoinGecko batch while the caller fetches the rest;
+# 4 workers and the per-host session pools leave room for concurrent sessions.
+_HTTP_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="aurora-http")
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.1),
+))
+
+# Runs each chart callback's history fetch alongside its price fetch, which stays in the
+# calling thread. Kept apart from _HTTP_POOL (price fetches submit their own work there)
+# and left at the default size, so slow history fetches from a few sessions do not
+# hold up everyone else's.
+_FETCH_POOL = ThreadPoolExecutor(thread_name_prefix="aurora-fetch")
+
+# Every configured coin, so one CoinGecko call covers whichever coin is viewed next.
+# Its usd quote goes into the live price average, so it expires with the price cache.
+COINGECKO_IDS = tuple(sorted({conf['coingecko_id'] for conf in COIN_CONFIG.values()}))
+
+@cache.memoize(timeout=PRICE_CACHE_TTL, response_filter=bool)
+def fetch_coingecko_batch(ids):
+    url = (f"https://api.coingecko.com/api/v3/simple/price"
+           f"?ids={'%2C'.join(ids)}&vs_currencies=usd"
+           f"&include_market_cap=true&include_24hr_vol=true&include_24hr_change=true")
+    try:
+        response = _HTTP_SESSION.get(url, timeout=5)
+        response.raise_for_status()
+        return _json_loads(response.content)
+    except Exception as e:
+        print(f"Failed to fetch {url}: {e}")
+        return {}
 
+@cache.memoize(timeout=PRICE_CACHE_TTL, response_filter=lambda result: result[0] is not None)
 def fetch_current_price_and_data(coin):
-    now = time.time()
-    
-    # Check cache first
-    if coin in price_cache and coin in coingecko_extra_cache:
-        cached_time_price, cached_price = price_cache[coin]
-        cached_time_data, cached_data = coingecko_extra_cache[coin]
-        if now - cached_time_price < PRICE_CACHE_TTL and now - cached_time_data < COINGECKO_CACHE_TTL:
-            return cached_price, cached_data
-
     # Get coin-specific configuration
     conf = COIN_CONFIG[coin]
-    coingecko_url = (f"https://api.coingecko.com/api/v3/simple/price"
-                     f"?ids={conf['coingecko_id']}&vs_currencies=usd"
-                     f"&include_market_cap=true&include_24hr_vol=true&include_24hr_change=true")
     cryptocompare_url = f"https://min-api.cryptocompare.com/data/price?fsym={conf['cc_symbol']}&tsyms=USD"
     kraken_url = f"https://api.kraken.com/0/public/Ticker?pair={conf['kraken_pair']}" if conf['kraken_pair'] else None
 
-    # List of URLs to fetch
-    urls = [coingecko_url, cryptocompare_url]
-    if kraken_url:
-        urls.append(kraken_url)
-
-    # Fetch data concurrently
     def fetch_url(url):
         try:
-            response = requests.get(url, timeout=5)
+            response = _HTTP_SESSION.get(url, timeout=5)
             response.raise_for_status()
-            return url, response.json()
+            return _json_loads(response.content)
         except Exception as e:
             print(f"Failed to fetch {url}: {e}")
-            return url, None
+            return None
 
-    with ThreadPoolExecutor() as executor:
-        results = list(executor.map(fetch_url, urls))
+    # CoinGecko and CryptoCompare are fetched concurrently
+    coingecko_future = _HTTP_POOL.submit(fetch_coingecko_batch, COINGECKO_IDS)
+    cryptocompare_data = fetch_url(cryptocompare_url)
 
     # Parse results
     prices = []
-    coingecko_data = None
-
-    for url, data in results:
-        if not data:
-            continue
-        if "coingecko" in url:
-            coingecko_data = data.get(conf['coingecko_id'], {})
-            if 'usd' in coingecko_data:
-                prices.append(coingecko_data['usd'])
-        elif "cryptocompare" in url:
-            prices.append(data.get('USD'))
-        elif "kraken" in url and data.get('result'):
-            pair = list(data['result'].keys())[0]
-            prices.append(float(data['result'][pair]['c'][0]))
+    coingecko_data = coingecko_future.result().get(conf['coingecko_id'])
+    if coingecko_data and 'usd' in coingecko_data:
+        prices.append(coingecko_data['usd'])
+    if cryptocompare_data and cryptocompare_data.get('USD') is not None:
+        prices.append(cryptocompare_data['USD'])
+
+    # Kraken is only a tiebreaker: consult it when a source is missing or the two disagree
+    if kraken_url and (len(prices) < 2 or abs(prices[0] - prices[1]) > KRAKEN_TIEBREAK_SPREAD * min(prices)):
+        kraken_data = fetch_url(kraken_url)
+        if kraken_data and kraken_data.get('result'):
+            pair = list(kraken_data['result'].keys())[0]
+            prices.append(float(kraken_data['result'][pair]['c'][0]))
 
     # Calculate average price
     if prices:
         avg_price = sum(prices) / len(prices)
-        price_cache[coin] = (time.time(), avg_price)
-        if coingecko_data:
-            coingecko_extra_cache[coin] = (time.time(), coingecko_data)
         return avg_price, coingecko_data
     else:
         return None, None
 
+def compute_indicators(closes):
+    # Every chart indicator for one close series; cached with the history that produced it
+    macd, signal = calc_macd(closes)
+    stochastic_k, stochastic_d = calc_stochastic(closes)
+    return {
+        "sma": calc_sma(closes),
+        "rsi": calc_rsi(closes, period=7),
+        "macd": macd,
+        "macd_signal": signal,
+        "stochastic_k": stochastic_k,
+        "stochastic_d": stochastic_d,
+        "ema": calc_ema(closes, period=20),
+    }
+
+def bar_buckets(n, max_bars):
+    # Start index of each run of consecutive bars to merge so at most max_bars remain.
+    # Every bucket holds the same number of bars (bar the last), keeping spacing even.
+    # Returns None when the series already fits.
+    if n <= max_bars:
+        return None
+    return np.arange(0, n, -(-n // max_bars))
+
+def empty_history():
+    return {
+        "t": np.empty(0, dtype="datetime64[s]"),
+        "o": np.empty(0, dtype=np.float32),
+        "h": np.empty(0, dtype=np.float32),
+        "l": np.empty(0, dtype=np.float32),
+        "c": np.empty(0, dtype=np.float32),
+        "v": np.empty(0, dtype=np.float32),
+        "indicators": {},
+        "first_close": None,
+        "version": None,
+    }
+
+# History is a dict of aligned columns: t (datetime64[s]), o/h/l/c/v (float32, ample
+# for displayed prices and half the bytes to filter, cache and ship), the indicators
+# computed from c, and a version identifying this fetch
+@cache.memoize(timeout=HISTORICAL_DATA_CACHE_TTL, response_filter=lambda history: len(history["t"]) > 0)
 def fetch_historical_data(coin, interval, timeframe):
-    now = time.time()
-    cache_key = (coin, interval, timeframe)
-    if cache_key in historical_data_cache:
-        cached_time, cached_data = historical_data_cache[cache_key]
-        if now - cached_time < HISTORICAL_DATA_CACHE_TTL:
-            return cached_data
-
     cc_symbol = COIN_CONFIG[coin]["cc_symbol"]
     limit = 2000  # Increased limit to ensure sufficient data
     aggregate = 1
@@ -119,65 +216,62 @@ def fetch_historical_data(coin, interval, timeframe):
             # Default to hourly if unknown interval
             url = f"https://min-api.cryptocompare.com/data/v2/histohour?fsym={cc_symbol}&tsym=USD&limit={limit}&aggregate=1"
 
-        response = requests.get(url, timeout=10)
+        response = _HTTP_SESSION.get(url, timeout=10)
         response.raise_for_status()
-        data = response.json()["Data"]["Data"]
+        data = _json_loads(response.content)["Data"]["Data"]
 
         if not data:
             print(f"No data received for coin: {coin}, interval: {interval}, timeframe: {timeframe}")
-            return [], [], [], [], [], []
-
-        # Convert timestamps to datetime objects
-        times = [datetime.utcfromtimestamp(d["time"]) for d in data]
-        opens = [d["open"] for d in data]
-        highs = [d["high"] for d in data]
-        lows = [d["low"] for d in data]
-        closes = [d["close"] for d in data]
-        volumes = [d["volumefrom"] for d in data]
-
-        # Calculate the start time based on timeframe
-        end_time = times[-1]
-        if timeframe == "1hour":
-            start_time = end_time - timedelta(hours=1)
-        elif timeframe == "1day":
-            start_time = end_time - timedelta(days=1)
-        elif timeframe == "1week":
-            start_time = end_time - timedelta(days=7)
-        elif timeframe == "1month":
-            start_time = end_time - timedelta(days=30)
-        elif timeframe == "3month":
-            start_time = end_time - timedelta(days=90)
-        elif timeframe == "6month":
-            start_time = end_time - timedelta(days=180)
-        elif timeframe == "1year":
-            start_time = end_time - timedelta(days=365)
-        elif timeframe == "ALL":
-            start_time = datetime(1970, 1, 1)
+            return empty_history()
+
+        # One pass over the payload into a record array, integer time plus float32 OHLCV
+        bars = np.array(
+            [(d["time"], d["open"], d["high"], d["low"], d["close"], d["volumefrom"]) for d in data],
+            dtype=BAR_DTYPE
+        )
+
+        # Calculate the start time based on timeframe; bars arrive oldest first, so the
+        # cutoff is a binary search and everything after it is kept
+        ts = bars["t"]
+        if timeframe == "ALL":
+            start = 0
         else:
-            start_time = end_time - timedelta(days=30)  # Default to 1 month
-
-        # Filter the data based on start_time
-        filtered_times = []
-        filtered_opens = []
-        filtered_highs = []
-        filtered_lows = []
-        filtered_closes = []
-        filtered_volumes = []
-        for t, o, h, l, c, v in zip(times, opens, highs, lows, closes, volumes):
-            if t >= start_time:
-                filtered_times.append(t)
-                filtered_opens.append(o)
-                filtered_highs.append(h)
-                filtered_lows.append(l)
-                filtered_closes.append(c)
-                filtered_volumes.append(v)
-
-        # Cache the filtered data
-        historical_data_cache[cache_key] = (now, (filtered_times, filtered_opens, filtered_highs, filtered_lows, filtered_closes, filtered_volumes))
-        return filtered_times, filtered_opens, filtered_highs, filtered_lows, filtered_closes, filtered_volumes
+            start_ts = ts[-1] - int(TIMEFRAME_WINDOWS.get(timeframe, timedelta(days=30)).total_seconds())
+            start = np.searchsorted(ts, start_ts)
+
+        # Split the kept bars into contiguous per-field columns
+        ts, opens, highs, lows, closes, volumes = (
+            np.ascontiguousarray(bars[field][start:]) for field in BAR_DTYPE.names
+        )
+        indicators = compute_indicators(closes)
+
+        # Merge runs of bars on long series: first open, max high, min low, last close and
+        # summed volume, so no wick or volume is lost. Indicators use every bar and are
+        # sampled at each merged bar's close.
+        # The header % change starts from the first raw close, which merging would replace
+        first_close = float(closes[0])
+        starts = bar_buckets(len(ts), MAX_CHART_POINTS)
+        if starts is not None:
+            ends = np.append(starts[1:], len(ts)) - 1
+            ts, opens, closes = ts[starts], opens[starts], closes[ends]
+            highs = np.maximum.reduceat(highs, starts)
+            lows = np.minimum.reduceat(lows, starts)
+            volumes = np.add.reduceat(volumes, starts)
+            indicators = {name: values[ends] for name, values in indicators.items()}
+        return {
+            "t": ts.astype("datetime64[s]"),
+            "o": opens,
+            "h": highs,
+            "l": lows,
+            "c": closes,
+            "v": volumes,
+            "indicators": indicators,
+            "first_close": first_close,
+            "version": (coin, interval, timeframe, time.time()),
+        }
     except Exception as e:
         print(f"Error fetching historical data for {coin} with interval {interval} and timeframe {timeframe}: {e}")
-        return [], [], [], [], [], []
+        return empty_history()
 
 
 def home_layout():
@@ -194,7 +288,7 @@ def home_layout():
                         target="_blank",  # Opens the link in a new tab
                         children=[
                             html.Img(
-                                src=app.get_asset_url("aurora_logo.png"),  # Use correct file path
+                                src=AURORA_LOGO_URL,
                                 className="home-logo",
                                 alt="Aurora Logo",
                             )
@@ -229,46 +323,57 @@ def home_layout():
         ]
      )
 
+# Interval dropdown options by category; static, so built once at import
+_MINUTE_INTERVALS = [
+    {"label": "1 Minute", "value": "1min"},
+    {"label": "3 Minutes", "value": "3min"},
+    {"label": "5 Minutes", "value": "5min"},
+    {"label": "10 Minutes", "value": "10min"},
+    {"label": "15 Minutes", "value": "15min"},
+    {"label": "30 Minutes", "value": "30min"},
+    {"label": "45 Minutes", "value": "45min"},
+]
+
+_HOUR_INTERVALS = [
+    {"label": "1 Hour", "value": "1hour"},
+    {"label": "2 Hours", "value": "2hour"},
+    {"label": "3 Hours", "value": "3hour"},
+    {"label": "4 Hours", "value": "4hour"},
+    {"label": "5 Hours", "value": "5hour"},
+]
+
+_DAY_INTERVALS = [
+    {"label": "1 Day", "value": "1day"},
+    {"label": "5 Days", "value": "5day"},
+    {"label": "1 Week", "value": "7day"},
+    {"label": "2 Weeks", "value": "14day"},
+    {"label": "1 Month", "value": "30day"},
+    {"label": "3 Months", "value": "90day"},
+    {"label": "6 Months", "value": "180day"},
+    {"label": "12 Months", "value": "365day"},
+]
+
+# Combine them with headers as disabled options
+INTERVAL_OPTIONS = [
+    {"label": "Minutes", "value": None, "disabled": True},
+] + _MINUTE_INTERVALS + [
+    {"label": "Hours", "value": None, "disabled": True},
+] + _HOUR_INTERVALS + [
+    {"label": "Days", "value": None, "disabled": True},
+] + _DAY_INTERVALS
+
+INDICATOR_OPTIONS = [
+    {"label": "Candle", "value": "candle"},
+    {"label": "Line", "value": "line"},
+    {"label": "SMA", "value": "sma"},
+    {"label": "RSI", "value": "rsi"},
+    {"label": "Volume", "value": "volume"},
+    {"label": "MACD", "value": "macd"},
+    {"label": "Stochastic Oscillator", "value": "stochastic"},
+    {"label": "EMA", "value": "ema"},
+]
+
 def main_layout(selected_coin="BTC"):
-    # Define intervals by category
-    minutes  = [
-        {"label": "1 Minute", "value": "1min"},
-        {"label": "3 Minutes", "value": "3min"},
-        {"label": "5 Minutes", "value": "5min"},
-        {"label": "10 Minutes", "value": "10min"},
-        {"label": "15 Minutes", "value": "15min"},
-        {"label": "30 Minutes", "value": "30min"},
-        {"label": "45 Minutes", "value": "45min"},
-    ]
-
-    hours = [
-        {"label": "1 Hour", "value": "1hour"},
-        {"label": "2 Hours", "value": "2hour"},
-        {"label": "3 Hours", "value": "3hour"},
-        {"label": "4 Hours", "value": "4hour"},
-        {"label": "5 Hours", "value": "5hour"},
-    ]
-
-    days = [
-        {"label": "1 Day", "value": "1day"},
-        {"label": "5 Days", "value": "5day"},
-        {"label": "1 Week", "value": "7day"},
-        {"label": "2 Weeks", "value": "14day"},
-        {"label": "1 Month", "value": "30day"},
-        {"label": "3 Months", "value": "90day"},
-        {"label": "6 Months", "value": "180day"},
-        {"label": "12 Months", "value": "365day"},
-    ]
-
-    # Combine them with headers as disabled options
-    interval_options = [
-        {"label": "Minutes", "value": None, "disabled": True},
-    ] + minutes + [
-        {"label": "Hours", "value": None, "disabled": True},
-    ] + hours + [
-        {"label": "Days", "value": None, "disabled": True},
-    ] + days
-    
     return html.Div([
         # Top Bar
         html.Div(className="top-bar", children=[
@@ -296,16 +401,7 @@ def main_layout(selected_coin="BTC"):
                 html.Div(className="indicators-dropdown-container", children=[
                     dcc.Dropdown(
                         id="indicators-dropdown",
-                        options=[
-                            {"label": "Candle", "value": "candle"},
-                            {"label": "Line", "value": "line"},
-                            {"label": "SMA", "value": "sma"},
-                            {"label": "RSI", "value": "rsi"},
-                            {"label": "Volume", "value": "volume"},
-                            {"label": "MACD", "value": "macd"},
-                            {"label": "Stochastic Oscillator", "value": "stochastic"},
-                            {"label": "EMA", "value": "ema"},
-                        ],
+                        options=INDICATOR_OPTIONS,
                         clearable=False,
                         value=["candle"],  # Default selection
                         multi=True,
@@ -318,7 +414,7 @@ def main_layout(selected_coin="BTC"):
                 html.Div(className="interval-dropdown-container", children=[
                     dcc.Dropdown(
                         id="interval-dropdown",
-                        options=interval_options,
+                        options=INTERVAL_OPTIONS,
                         value="1hour",  # Default value
                         clearable=False,
                         style={"width": "120px", "color": "black"}
@@ -328,15 +424,16 @@ def main_layout(selected_coin="BTC"):
 
 
             # Timeframe Duration Buttons
+            # Matched as a group by the {"type": "timeframe-button", "index": ALL} callbacks
             html.Div(className="timeframe-buttons", children=[
-                html.Button("1H", id="btn-1hour", className="timeframe-button"),
-                html.Button("1D", id="btn-1day", className="timeframe-button"),
-                html.Button("1W", id="btn-1week", className="timeframe-button"),
-                html.Button("1M", id="btn-1month", className="timeframe-button"),
-                html.Button("3M", id="btn-3month", className="timeframe-button"),
-                html.Button("6M", id="btn-6month", className="timeframe-button"),
-                html.Button("1Y", id="btn-1year", className="timeframe-button"),
-                html.Button("All", id="btn-ALL", className="timeframe-button"),
+                html.Button("1H", id={"type": "timeframe-button", "index": "1hour"}, className="timeframe-button"),
+                html.Button("1D", id={"type": "timeframe-button", "index": "1day"}, className="timeframe-button"),
+                html.Button("1W", id={"type": "timeframe-button", "index": "1week"}, className="timeframe-button"),
+                html.Button("1M", id={"type": "timeframe-button", "index": "1month"}, className="timeframe-button"),
+                html.Button("3M", id={"type": "timeframe-button", "index": "3month"}, className="timeframe-button"),
+                html.Button("6M", id={"type": "timeframe-button", "index": "6month"}, className="timeframe-button"),
+                html.Button("1Y", id={"type": "timeframe-button", "index": "1year"}, className="timeframe-button"),
+                html.Button("All", id={"type": "timeframe-button", "index": "ALL"}, className="timeframe-button"),
             ]),
 
             # Price Info
@@ -383,6 +480,7 @@ def main_layout(selected_coin="BTC"):
         ),
 
         dcc.Store(id='last-price-store', data=None),
+        dcc.Store(id='chart-version-store', data=None),
         dcc.Store(id='toggles-store', data={
             "coin": selected_coin,
             "interval": "1hour",
@@ -428,83 +526,191 @@ def navigate_to_main_page(crypto_selected):
         return "/main", crypto_selected
     return "/", None
 
-@app.callback(
+# Toggle and button-style updates are pure UI state, so they run in the browser
+# (see assets/toggles.js)
+app.clientside_callback(
+    ClientsideFunction(namespace="toggles", function_name="update_toggles"),
     Output('toggles-store', 'data'),
     [
         Input('crypto-selector', 'value'),
         Input('interval-dropdown', 'value'),
-        Input('indicators-dropdown', 'value'),# New Input for Interval Dropdown
-        Input('btn-1hour', 'n_clicks'),
-        Input('btn-1day', 'n_clicks'),
-        Input('btn-1week', 'n_clicks'),
-        Input('btn-1month', 'n_clicks'),
-        Input('btn-3month', 'n_clicks'),
-        Input('btn-6month', 'n_clicks'),
-        Input('btn-1year', 'n_clicks'),
-        Input('btn-ALL', 'n_clicks'),
+        Input('indicators-dropdown', 'value'),
+        Input({'type': 'timeframe-button', 'index': ALL}, 'n_clicks'),
     ],
     [State('toggles-store', 'data')],
     prevent_initial_call=True
 )
-def update_toggles(selected_coin,
-                   interval_value,
-                   indicators_selected,
-                   b1hour, b1day, b1week, b1month, b3month, b6month, b1year, bALL,
-                   toggles):
-    ctx = dash.callback_context
 
-    if not ctx.triggered:
-        return toggles
-    changed_id = ctx.triggered[0]['prop_id'].split('.')[0]
-
-    # Update coin selection
-    if changed_id == 'crypto-selector' and selected_coin:
-        toggles["coin"] = selected_coin
-
-    # Update interval selection from dropdown
-    elif changed_id == 'interval-dropdown' and interval_value:
-        toggles["interval"] = interval_value
-
-    # Update indicators from Indicators Dropdown
-    elif changed_id == 'indicators-dropdown':
-        # Handle Chart Type
-        if "candle" in indicators_selected:
-            toggles["chart_type"] = "candle"
-            # Ensure only 'candle' or 'line' is selected
-            if "line" in indicators_selected:
-                indicators_selected.remove("line")
-        elif "line" in indicators_selected:
-            toggles["chart_type"] = "line"
-            if "candle" in indicators_selected:
-                indicators_selected.remove("candle")
-        else:
-            # Default chart type if neither is selected
-            toggles["chart_type"] = "candle"
-
-        # Handle Indicators
-        toggles["sma_on"] = "sma" in indicators_selected
-        toggles["rsi_on"] = "rsi" in indicators_selected
-        toggles["volume_on"] = "volume" in indicators_selected
-        toggles["macd_on"] = "macd" in indicators_selected
-        toggles["stochastic_on"] = "stochastic" in indicators_selected
-        toggles["ema_on"] = "ema" in indicators_selected
-
-    # Update timeframe selection from buttons
-    elif changed_id in ['btn-1hour','btn-1day', 'btn-1week', 'btn-1month', 'btn-3month', 'btn-6month', 'btn-1year', 'btn-ALL']:
-        timeframe_map = {
-            'btn-1hour': "1hour",
-            'btn-1day': "1day",
-            'btn-1week': "1week",
-            'btn-1month': "1month",
-            'btn-3month': "3month",
-            'btn-6month': "6month",
-            'btn-1year': "1year",
-            'btn-ALL': "ALL",
-        }
-        set_timeframe = timeframe_map.get(changed_id, "1month")
-        toggles["timeframe"] = set_timeframe
+# Static chart styling, built once instead of on every update_chart call
+_BASE_LAYOUT = dict(
+    paper_bgcolor="#121212",
+    plot_bgcolor="#1e1e2f",
+    xaxis=dict(
+        type="date",
+        gridcolor="gray",
+        showgrid=True,
+        showline=False,
+        linecolor='white',
+        tickfont=dict(color='white'),
+    ),
+    yaxis=dict(
+        gridcolor="gray",
+        showgrid=True,
+        showline=False,
+        linecolor='white',
+        tickfont=dict(color='white'),
+    ),
+    font=dict(color='white'),
+    margin=dict(l=50, r=150, t=50, b=50)  # Increased right margin to accommodate additional y-axes
+)
+
+_RSI_AXIS = dict(
+    overlaying='y',
+    side='right',
+    position=0.99,
+    range=[0, 100],
+    showgrid=False,
+    tickfont=dict(color='magenta'),
+    title='RSI'
+)
 
-    return toggles
+_VOLUME_AXIS = dict(
+    overlaying='y',
+    side='right',
+    showgrid=False,
+    tickfont=dict(color='rgba(200,200,200,0.7)'),
+    title='Volume'
+)
+
+# Range is filled in per render from the MACD values
+_MACD_AXIS = dict(
+    overlaying='y',
+    side='right',
+    position=0.95,
+    showgrid=False,
+    tickfont=dict(color='cyan'),
+    title='MACD'
+)
+
+_STOCHASTIC_AXIS = dict(
+    overlaying='y',
+    side='right',
+    position=0.98,
+    range=[0, 100],
+    showgrid=False,
+    tickfont=dict(color='green'),
+    title='Stochastic Oscillator'
+)
+
+# Figures only change with the history snapshot or the chart toggles, so the built dict is
+# cached on those; history itself is left out of the key in favour of its version
+@cache.memoize(timeout=HISTORICAL_DATA_CACHE_TTL, args_to_ignore=["history"])
+def build_chart_figure(history, data_version, coin, chart_type,
+                       sma_on, rsi_on, volume_on, macd_on, stochastic_on, ema_on):
+    closes, indicators = history["c"], history["indicators"]
+    # Epoch milliseconds on the date axis ship as a binary float64 array per trace rather
+    # than a list of ISO strings; hover labels are still formatted as dates
+    times = history["t"].astype("datetime64[ms]").astype(np.float64)
+    fig = go.Figure()
+
+    if chart_type == "candle":
+        fig.add_trace(go.Candlestick(
+            x=times,
+            open=history["o"],
+            high=history["h"],
+            low=history["l"],
+            close=closes,
+            increasing_line_color="green",
+            decreasing_line_color="red",
+            name=coin
+        ))
+    else:
+        fig.add_trace(go.Scatter(
+            x=times, y=closes, mode='lines', line=dict(color='#ff8aff', width=2),
+            name=coin
+        ))
+
+    # SMA if on
+    if sma_on:
+        sma_values = indicators["sma"]
+        fig.add_trace(go.Scatter(
+            x=times, y=sma_values, mode='lines', line=dict(color='yellow', width=2),
+            name="SMA(14)"
+        ))
+
+    # RSI if on
+    if rsi_on:
+        rsi_values = indicators["rsi"]
+        fig.add_trace(go.Scatter(
+            x=times, y=rsi_values, mode='lines', line=dict(color='magenta', width=2),
+            name="RSI(14)",
+            yaxis="y2"
+        ))
+        fig.update_layout(yaxis2=_RSI_AXIS)
+
+    # Volume if on
+    if volume_on:
+        fig.add_trace(go.Bar(
+            x=times, y=history["v"], name='Volume',
+            marker_color='rgba(200,200,200,0.3)',
+            yaxis='y3'
+        ))
+        fig.update_layout(yaxis3=_VOLUME_AXIS)
+
+    # MACD if on
+    if macd_on:
+        macd, signal = indicators["macd"], indicators["macd_signal"]
+        fig.add_trace(go.Scatter(
+            x=times, y=macd, mode='lines', line=dict(color='cyan', width=1),
+            name="MACD",
+            yaxis="y4"
+        ))
+        fig.add_trace(go.Scatter(
+            x=times, y=signal, mode='lines', line=dict(color='red', width=1),
+            name="Signal Line",
+            yaxis="y4"
+        ))
+        fig.update_layout(yaxis4=dict(_MACD_AXIS, range=[float(np.min(macd)), float(np.max(macd))]))
+
+    # Stochastic Oscillator if on
+    if stochastic_on:
+        stochastic_k, stochastic_d = indicators["stochastic_k"], indicators["stochastic_d"]
+        fig.add_trace(go.Scatter(
+            x=times, y=stochastic_k, mode='lines', line=dict(color='green', width=1),
+            name='Stochastic %K',
+            yaxis='y5'
+        ))
+        fig.add_trace(go.Scatter(
+            x=times, y=stochastic_d, mode='lines', line=dict(color='blue', width=1),
+            name='Stochastic %D',
+            yaxis='y5'
+        ))
+        fig.update_layout(yaxis5=_STOCHASTIC_AXIS)
+
+    # EMA if on
+    if ema_on:
+        ema_values = indicators["ema"]
+        fig.add_trace(go.Scatter(
+            x=times, y=ema_values, mode='lines', line=dict(color='lime', width=1),
+            name='EMA(20)'
+        ))
+
+    fig.update_layout(**_BASE_LAYOUT)
+
+    return fig.to_plotly_json()
+
+_TRACE_DATA_KEYS = ("x", "y", "open", "high", "low", "close")
+
+def patch_chart_data(figure):
+    patched = Patch()
+    for i, trace in enumerate(figure["data"]):
+        for key in _TRACE_DATA_KEYS:
+            if key in trace:
+                patched["data"][i][key] = trace[key]
+    # The MACD axis range is fitted to the data, so it moves with it
+    if "yaxis4" in figure["layout"]:
+        patched["layout"]["yaxis4"]["range"] = figure["layout"]["yaxis4"]["range"]
+    return patched
 
 @app.callback(
     [
@@ -513,15 +719,16 @@ def update_toggles(selected_coin,
         Output("price-change", "children"),
         Output("price-change", "className"),
         Output("candlestick-chart", "figure"),
-        Output('last-price-store', 'data')
+        Output('last-price-store', 'data'),
+        Output('chart-version-store', 'data')
     ],
     [
         Input("toggles-store", "data"),
         Input("update-interval", "n_intervals")
     ],
-    [State('last-price-store', 'data')]
+    [State('last-price-store', 'data'), State('chart-version-store', 'data')]
 )
-def update_chart(toggles, n_intervals, last_price):
+def update_chart(toggles, n_intervals, last_price, last_chart_version):
     coin = toggles.get("coin", "BTC")
     interval = toggles.get("interval", "1hour")
     timeframe = toggles.get("timeframe", "1month")
@@ -533,21 +740,38 @@ def update_chart(toggles, n_intervals, last_price):
     stochastic_on = toggles.get("stochastic_on", False)
     ema_on = toggles.get("ema_on", False)
 
+    ctx = dash.callback_context
+    triggered_ids = {t['prop_id'].split('.')[0] for t in ctx.triggered}
+    interval_tick = triggered_ids == {'update-interval'}
+
+    # Fetch history in the background while the live price is fetched here; cache hits
+    # resolve immediately
+    history_future = _FETCH_POOL.submit(fetch_historical_data, coin, interval, timeframe)
     price, coingecko_data = fetch_current_price_and_data(coin)
-    times, opens, highs, lows, closes, volumes = fetch_historical_data(coin, interval, timeframe)
 
-    if not times:
+    # A timer tick that brings no new price would only redraw an identical chart
+    if (interval_tick and price is not None and last_price is not None
+            and math.isclose(price, last_price, rel_tol=1e-9)):
+        raise PreventUpdate
+
+    history = history_future.result()
+    times, closes = history["t"], history["c"]
+
+    # Selected coin logo next to the price
+    selected_coin_logo_src = COIN_CONFIG[coin]["logo"]
+
+    if len(times) == 0:
         # If no data is returned, avoid plotting
-        fig = go.Figure()
-        fig.update_layout(
+        figure = go.Figure(layout=dict(
             paper_bgcolor="#121212",
             plot_bgcolor="#220d2b",
             font=dict(color='white')
-        )
+        )).to_plotly_json()
         price_text = "..."
         change_text = "0.00%"
         change_class = "percentage-white"
         current_price_store = last_price
+        chart_version = None
     else:
         if price is None:
             price_text = "..."
@@ -557,7 +781,7 @@ def update_chart(toggles, n_intervals, last_price):
             price_text = f"${price:.4f}"
             current_price_store = price
             if len(closes) > 1:
-                start_price = closes[0]
+                start_price = history["first_close"]
                 end_price = closes[-1]
                 hist_change = ((end_price - start_price)/start_price)*100
             else:
@@ -573,190 +797,38 @@ def update_chart(toggles, n_intervals, last_price):
             change_text = f"{hist_change:.2f}%"
             change_class = "percentage-white"
 
-        fig = go.Figure()
-
-        if chart_type == "candle":
-            fig.add_trace(go.Candlestick(
-                x=times,
-                open=opens,
-                high=highs,
-                low=lows,
-                close=closes,
-                increasing_line_color="green",
-                decreasing_line_color="red",
-                name=coin
-            ))
-        else:
-            fig.add_trace(go.Scatter(
-                x=times, y=closes, mode='lines', line=dict(color='#ff8aff', width=2),
-                name=coin
-            ))
-
-        closes_array = np.array(closes, dtype=float)
-
-        # SMA if on
-        if sma_on:
-            sma_values = calc_sma(closes_array)
-            fig.add_trace(go.Scatter(
-                x=times, y=sma_values, mode='lines', line=dict(color='yellow', width=2),
-                name="SMA(14)"
-            ))
-
-        # RSI if on
-        if rsi_on:
-            rsi_values = calc_rsi(closes_array, period=7)
-            fig.add_trace(go.Scatter(
-                x=times, y=rsi_values, mode='lines', line=dict(color='magenta', width=2),
-                name="RSI(14)",
-                yaxis="y2"
-            ))
-            fig.update_layout(
-                yaxis2=dict(
-                    overlaying='y',
-                    side='right',
-                    position=0.99,
-                    range=[0, 100],
-                    showgrid=False,
-                    tickfont=dict(color='magenta'),
-                    title='RSI'
-                )
-            )
-
-        # Volume if on
-        if volume_on:
-            fig.add_trace(go.Bar(
-                x=times, y=volumes, name='Volume',
-                marker_color='rgba(200,200,200,0.3)',
-                yaxis='y3'
-            ))
-            fig.update_layout(
-                yaxis3=dict(
-                    overlaying='y',
-                    side='right',
-                    showgrid=False,
-                    tickfont=dict(color='rgba(200,200,200,0.7)'),
-                    title='Volume'
-                )
-            )
-
-        # MACD if on
-        if macd_on:
-            macd, signal = calc_macd(closes_array)
-            fig.add_trace(go.Scatter(
-                x=times, y=macd, mode='lines', line=dict(color='cyan', width=1),
-                name="MACD",
-                yaxis="y4"
-            ))
-            fig.add_trace(go.Scatter(
-                x=times, y=signal, mode='lines', line=dict(color='red', width=1),
-                name="Signal Line",
-                yaxis="y4"
-            ))
-            fig.update_layout(
-                yaxis4=dict(
-                    overlaying='y',
-                    side='right',
-                    position=0.95,
-                    range=[min(macd), max(macd)],
-                    showgrid=False,
-                    tickfont=dict(color='cyan'),
-                    title='MACD'
-                )
-            )
-
-        # Stochastic Oscillator if on
-        if stochastic_on:
-            stochastic_k, stochastic_d = calc_stochastic(closes_array)
-            fig.add_trace(go.Scatter(
-                x=times, y=stochastic_k, mode='lines', line=dict(color='green', width=1),
-                name='Stochastic %K',
-                yaxis='y5'
-            ))
-            fig.add_trace(go.Scatter(
-                x=times, y=stochastic_d, mode='lines', line=dict(color='blue', width=1),
-                name='Stochastic %D',
-                yaxis='y5'
-            ))
-            fig.update_layout(
-                yaxis5=dict(
-                    overlaying='y',
-                    side='right',
-                    position=0.98,
-                    range=[0, 100],
-                    showgrid=False,
-                    tickfont=dict(color='green'),
-                    title='Stochastic Oscillator'
-                )
-            )
-
-        # EMA if on
-        if ema_on:
-            ema_values = calc_ema(closes_array, period=20)
-            fig.add_trace(go.Scatter(
-                x=times, y=ema_values, mode='lines', line=dict(color='lime', width=1),
-                name='EMA(20)'
-            ))
-
-        fig.update_layout(
-            paper_bgcolor="#121212",
-            plot_bgcolor="#1e1e2f",
-            xaxis=dict(
-                gridcolor="gray",
-                showgrid=True,
-                showline=False,
-                linecolor='white',
-                tickfont=dict(color='white'),
-            ),
-            yaxis=dict(
-                gridcolor="gray",
-                showgrid=True,
-                showline=False,
-                linecolor='white',
-                tickfont=dict(color='white'),
-            ),
-            font=dict(color='white'),
-            margin=dict(l=50, r=150, t=50, b=50)  # Increased right margin to accommodate additional y-axes
-        )
+        figure = build_chart_figure(history, history["version"], coin, chart_type,
+                                    sma_on, rsi_on, volume_on, macd_on, stochastic_on, ema_on)
+        chart_version = list(history["version"])
 
-        # Selected coin logo next to the price:
-        selected_coin_logo_src = COIN_CONFIG[coin]["logo"]
+        # On a timer tick the toggles, and so the chart structure, are unchanged:
+        # leave the figure alone if the history is the same, else patch only trace data
+        if interval_tick and last_chart_version is not None:
+            if last_chart_version == chart_version:
+                figure = no_update
+            else:
+                figure = patch_chart_data(figure)
 
     return (
         selected_coin_logo_src,
         price_text,
         change_text,
         change_class,
-        fig,
-        current_price_store
+        figure,
+        current_price_store,
+        chart_version
     )
 
-@app.callback(
-    [
-        Output("btn-1hour", "className"),
-        Output("btn-1day", "className"),
-        Output("btn-1week", "className"),
-        Output("btn-1month", "className"),
-        Output("btn-3month", "className"),
-        Output("btn-6month", "className"),
-        Output("btn-1year", "className"),
-        Output("btn-ALL", "className"),
-    ],
-    Input("toggles-store", "data")
+app.clientside_callback(
+    ClientsideFunction(namespace="toggles", function_name="timeframe_button_styles"),
+    Output({"type": "timeframe-button", "index": ALL}, "className"),
+    Input("toggles-store", "data"),
+    State({"type": "timeframe-button", "index": ALL}, "id")
 )
-def update_timeframe_button_styles(toggles):
-    timeframe = toggles.get("timeframe", "1month")
-    return [
-        "timeframe-button selected" if timeframe == "1hour" else "timeframe-button",
-        "timeframe-button selected" if timeframe == "1day" else "timeframe-button",
-        "timeframe-button selected" if timeframe == "1week" else "timeframe-button",
-        "timeframe-button selected" if timeframe == "1month" else "timeframe-button",
-        "timeframe-button selected" if timeframe == "3month" else "timeframe-button",
-        "timeframe-button selected" if timeframe == "6month" else "timeframe-button",
-        "timeframe-button selected" if timeframe == "1year" else "timeframe-button",
-        "timeframe-button selected" if timeframe == "ALL" else "timeframe-button",
-    ]
 
+@lru_cache(maxsize=1)
 def get_sorted_dropdown_options():
+    # COIN_CONFIG is static, so the grouped options are built once per process
     # Group coins by category
     categories = {}
     for coin, details in COIN_CONFIG.items():
@@ -783,4 +855,4 @@ def get_sorted_dropdown_options():
 
 
 if __name__ == "__main__":
-    app.run_server(debug=False)
\ No newline at end of file
+    app.run(debug=False)
\ No newline at end of file
@@ -1,100 +1,110 @@
 import numpy as np
 
-def calc_sma(values, period=14):
-    sma = []
-    for i in range(len(values)):
-        if i < period-1:
-            sma.append(None)
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional: without it the kernels below run as plain Python loops
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# fastmath minus the no-NaN/no-Inf flags, since outputs carry NaN warm-up padding
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+def _as_float_array(values):
+    # float32 and float64 pass through untouched; kernels accumulate in float64 and
+    # return the input's dtype
+    values = np.asarray(values)
+    if values.dtype != np.float32 and values.dtype != np.float64:
+        values = values.astype(np.float64)
+    return values
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _ema_kernel(values, period):
+    out = np.empty(values.shape[0], dtype=values.dtype)
+    if values.shape[0] == 0:
+        return out
+    k = 2.0 / (period + 1)
+    ema_current = float(values[0])
+    out[0] = ema_current
+    for i in range(1, values.shape[0]):
+        ema_current = values[i] * k + ema_current * (1 - k)
+        out[i] = ema_current
+    return out
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _rsi_kernel(gains, losses, period):
+    # Wilder smoothing over the price changes; gains/losses are one shorter than the series
+    out = np.full(gains.shape[0] + 1, np.nan, dtype=gains.dtype)
+    avg_gain = float(gains[:period].mean())
+    avg_loss = float(losses[:period].mean())
+    for i in range(period, out.shape[0]):
+        if i > period:
+            avg_gain = (avg_gain*(period-1) + gains[i-1])/period
+            avg_loss = (avg_loss*(period-1) + losses[i-1])/period
+        if avg_loss == 0:
+            out[i] = 100.0
+        else:
+            rs = avg_gain/avg_loss
+            out[i] = 100 - (100/(1+rs))
+    return out
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _stochastic_k_kernel(values, period):
+    out = np.full(values.shape[0], np.nan, dtype=values.dtype)
+    for i in range(period-1, values.shape[0]):
+        window = values[i-period+1:i+1]
+        min_val = window.min()
+        max_val = window.max()
+        if max_val - min_val == 0:
+            out[i] = 0.0
         else:
-            sma.append(np.mean(values[i-period+1:i+1]))
+            out[i] = ((values[i] - min_val) / (max_val - min_val)) * 100
+    return out
+
+
+def calc_sma(values, period=14):
+    # Rolling mean from differences of a float64 running sum: O(n), no Python loop
+    values = _as_float_array(values)
+    sma = np.full(len(values), np.nan, dtype=values.dtype)
+    if len(values) < period:
+        return sma
+    csum = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    sma[period-1:] = (csum[period:] - csum[:-period]) / period
     return sma
 
 def calc_rsi(values, period=14):
-    if len(values) < period:
-        return [None]*len(values)
+    values = _as_float_array(values)
+    if len(values) <= period:
+        return np.full(len(values), np.nan, dtype=values.dtype)
     changes = np.diff(values)
-    gains = np.where(changes > 0, changes, 0)
-    losses = np.where(changes < 0, -changes, 0)
-
-    rsi = [None]*(period)
-    avg_gain = np.mean(gains[:period])
-    avg_loss = np.mean(losses[:period])
-    if avg_loss == 0:
-        rsi.append(100.0)
-    else:
-        rs = avg_gain/avg_loss
-        rsi.append(100 - (100/(1+rs)))
-
-    for i in range(period+1, len(values)):
-        gain = gains[i-1]
-        loss = losses[i-1]
-        avg_gain = (avg_gain*(period-1) + gain)/period
-        avg_loss = (avg_loss*(period-1) + loss)/period
-        if avg_loss == 0:
-            rsi.append(100.0)
-        else:
-            rs = avg_gain/avg_loss
-            rsi.append(100 - (100/(1+rs)))
-    return [None]*period + rsi
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+    return _rsi_kernel(gains, losses, period)
 
 def calc_macd(values, fast_period=12, slow_period=26, signal_period=9):
     # Calculate MACD
     ema_fast = calc_ema(values, fast_period)
     ema_slow = calc_ema(values, slow_period)
-    macd = [f - s if f is not None and s is not None else None for f, s in zip(ema_fast, ema_slow)]
-    signal = calc_sma([m for m in macd if m is not None], signal_period)
-    # Align signal with macd
-    signal_full = [None]*(len(macd)-len(signal)) + signal
-    return macd, signal_full
+    macd = ema_fast - ema_slow
+    signal = calc_sma(macd, signal_period)
+    return macd, signal
 
 def calc_stochastic(values, period=14, smooth_k=3, smooth_d=3):
     # Calculate Stochastic Oscillator
+    values = _as_float_array(values)
     if len(values) < period:
-        return [None]*len(values), [None]*len(values)
-    stochastic_k = []
-    stochastic_d = []
-    for i in range(len(values)):
-        if i < period-1:
-            stochastic_k.append(None)
-            stochastic_d.append(None)
-        else:
-            window = values[i-period+1:i+1]
-            min_val = min(window)
-            max_val = max(window)
-            current = values[i]
-            if max_val - min_val == 0:
-                k = 0
-            else:
-                k = ((current - min_val) / (max_val - min_val)) * 100
-            stochastic_k.append(k)
-    # Smooth %K to get %D
-    for i in range(len(stochastic_k)):
-        if stochastic_k[i] is None:
-            stochastic_d.append(None)
-        else:
-            if i < smooth_k -1:
-                stochastic_d.append(None)
-            else:
-                window = [k for k in stochastic_k[i-smooth_k+1:i+1] if k is not None]
-                if len(window) < smooth_k:
-                    stochastic_d.append(None)
-                else:
-                    stochastic_d.append(np.mean(window))
+        return np.full(len(values), np.nan, dtype=values.dtype), np.full(len(values), np.nan, dtype=values.dtype)
+    stochastic_k = _stochastic_k_kernel(values, period)
+    # Smooth %K to get %D, skipping the warm-up padding
+    stochastic_d = np.full(len(values), np.nan, dtype=values.dtype)
+    stochastic_d[period-1:] = calc_sma(stochastic_k[period-1:], smooth_k)
     return stochastic_k, stochastic_d
 
 
 def calc_ema(values, period=20):
     # Calculate Exponential Moving Average
-    ema = []
-    k = 2 / (period + 1)
-    ema_current = None
-    for i, val in enumerate(values):
-        if val is None:
-            ema.append(None)
-            continue
-        if ema_current is None:
-            ema_current = val
-        else:
-            ema_current = val * k + ema_current * (1 - k)
-        ema.append(ema_current)
-    return ema
\ No newline at end of file
+    return _ema_kernel(_as_float_array(values), period)